@@ -0,0 +1,115 @@
+"""
+Numerical Kernels Module
+Quality masking and fused reductions over SWOT observation arrays,
+the reductions JIT-compiled with Numba
+"""
+
+import numpy as np
+
+try:
+    import numba
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+
+def good_quality_mask(quality):
+    """
+    Return a boolean array selecting rows whose quality flag is 'good'
+
+    Categorical flags compare on their integer codes; a categorical without
+    a 'good' category selects nothing. Plain string flags compare directly.
+    """
+    if hasattr(quality, 'cat'):
+        good = quality.cat.categories.get_indexer(['good'])[0]
+        if good == -1:
+            return np.zeros(len(quality), dtype=bool)
+        return quality.cat.codes.to_numpy() == good
+    return quality.to_numpy() == 'good'
+
+
+if HAVE_NUMBA:
+
+    # One accumulator slot per worker thread
+    N_CHUNKS = numba.config.NUMBA_NUM_THREADS
+
+    # Fast-math without the no-inf/no-nan assumptions, since the min/max
+    # accumulators start at +/-inf
+    FASTMATH_FLAGS = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+    @njit(parallel=True, fastmath=FASTMATH_FLAGS, cache=True)
+    def reduce_stats(elev, area, good_mask):
+        """
+        Compute elevation statistics for good quality rows in fused passes
+
+        NaN values are skipped, and statistics without enough rows are NaN,
+        matching the NumPy path in the analyzer.
+
+        Args:
+            elev: float64 array of water elevations
+            area: float64 array of water areas
+            good_mask: boolean array selecting good quality rows
+
+        Returns:
+            tuple: (mean, median, std, min, max, total_area, elevation_change)
+        """
+        n = elev.shape[0]
+        n_chunks = N_CHUNKS
+        chunk = (n + n_chunks - 1) // n_chunks
+
+        # Per-thread accumulators, combined after the parallel loop
+        counts = np.zeros(n_chunks, dtype=np.int64)
+        sums = np.zeros(n_chunks)
+        area_sums = np.zeros(n_chunks)
+        mins = np.full(n_chunks, np.inf)
+        maxs = np.full(n_chunks, -np.inf)
+
+        for c in prange(n_chunks):
+            for i in range(c * chunk, min((c + 1) * chunk, n)):
+                if not good_mask[i]:
+                    continue
+                if not np.isnan(area[i]):
+                    area_sums[c] += area[i]
+                x = elev[i]
+                if np.isnan(x):
+                    continue
+                counts[c] += 1
+                sums[c] += x
+                if x < mins[c]:
+                    mins[c] = x
+                if x > maxs[c]:
+                    maxs[c] = x
+
+        count = counts.sum()
+        if count == 0:
+            return np.nan, np.nan, np.nan, np.nan, np.nan, area_sums.sum(), np.nan
+        mean = sums.sum() / count
+
+        # Sample variance around the mean (ddof=1, as pandas)
+        sq_devs = np.zeros(n_chunks)
+        for c in prange(n_chunks):
+            for i in range(c * chunk, min((c + 1) * chunk, n)):
+                if good_mask[i] and not np.isnan(elev[i]):
+                    d = elev[i] - mean
+                    sq_devs[c] += d * d
+        std = np.sqrt(sq_devs.sum() / (count - 1)) if count > 1 else np.nan
+
+        good = elev[good_mask & ~np.isnan(elev)]
+        median = np.median(good)
+
+        # Mean of high vs low elevation halves around the median
+        high_sum = 0.0
+        high_count = 0
+        for i in prange(count):
+            if good[i] > median:
+                high_sum += good[i]
+                high_count += 1
+        if high_count == 0 or high_count == count:
+            # One half is empty, e.g. when all elevations are equal
+            change = np.nan
+        else:
+            low_sum = sums.sum() - high_sum
+            change = high_sum / high_count - low_sum / (count - high_count)
+
+        return mean, median, std, mins.min(), maxs.max(), area_sums.sum(), change
@@ -6,6 +6,10 @@ Retrieves SWOT satellite data and performs water resource analysis
 
 import os
 import sys
+import time
+import argparse
+import traceback
+import functools
 from datetime import datetime
 import yaml
 from pathlib import Path
@@ -15,63 +19,87 @@ from analyzer import WaterLevelAnalyzer
 from visualizer import SWOTVisualizer
 
 
+@functools.lru_cache(maxsize=1)
 def load_config():
-    """Load configuration from config.yaml"""
+    """Load configuration from config.yaml (parsed once per process)"""
     config_path = Path(__file__).parent / 'config.yaml'
     with open(config_path, 'r') as f:
         return yaml.safe_load(f)
 
 
+def run_once(fetcher, analyzer, visualizer):
+    """Fetch, analyze and plot one batch of SWOT data"""
+    print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    
+    # Fetch SWOT data
+    print(f"\nFetching SWOT data from NASA...")
+    data = fetcher.fetch_latest_data()
+    if data is None or len(data) == 0:
+        print("No new SWOT data available. Waiting for next overpass.")
+        return
+    print(f"Data fetched: {len(data)} observations")
+    
+    # Perform analysis
+    print(f"\nPerforming water level analysis...")
+    results = analyzer.analyze(data)
+    print(f"Analysis complete")
+    print(f"  - Water bodies tracked: {results['total_features']}")
+    print(f"  - Mean elevation: {results['mean_elevation']:.2f} m")
+    print(f"  - Elevation change: {results['elevation_change']:.2f} m")
+    
+    # Generate visualizations
+    print(f"\nGenerating visualizations...")
+    plots = visualizer.create_plots(data, results)
+    print(f"Visualizations created: {len(plots)} plots")
+    
+    # Save results
+    print(f"\nSaving results...")
+    result_file = Path('results') / f"swot_analysis_{datetime.now().strftime('%Y%m%d')}.json"
+    result_file.parent.mkdir(exist_ok=True)
+    analyzer.save_results(results, result_file)
+    print(f"Results saved to {result_file}")
+    
+    print(f"\n=== Analysis Complete ===")
+    print(f"Finished at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description='NASA SWOT Water Level Monitoring System')
+    parser.add_argument('--interval', type=float, default=0,
+                        help='keep running and repeat every INTERVAL seconds (default: run once)')
+    args = parser.parse_args()
+    
     print(f"=== NASA SWOT Monitoring System ===")
-    print(f"Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
     try:
         # Load configuration
         config = load_config()
         print(f"Configuration loaded")
         
-        # Initialize modules
+        # Initialize modules once and reuse them for every run
         fetcher = SWOTDataFetcher(config['data_sources'])
         analyzer = WaterLevelAnalyzer(config['analysis'])
         visualizer = SWOTVisualizer(config['visualization'])
         print(f"Modules initialized")
         
-        # Fetch SWOT data
-        print(f"\nFetching SWOT data from NASA...")
-        data = fetcher.fetch_latest_data()
-        if data is None or len(data) == 0:
-            print("No new SWOT data available. Waiting for next overpass.")
+        if not args.interval:
+            run_once(fetcher, analyzer, visualizer)
             return
-        print(f"Data fetched: {len(data)} observations")
-        
-        # Perform analysis
-        print(f"\nPerforming water level analysis...")
-        results = analyzer.analyze(data)
-        print(f"Analysis complete")
-        print(f"  - Water bodies tracked: {results['total_features']}")
-        print(f"  - Mean elevation: {results['mean_elevation']:.2f} m")
-        print(f"  - Elevation change: {results['elevation_change']:.2f} m")
-        
-        # Generate visualizations
-        print(f"\nGenerating visualizations...")
-        plots = visualizer.create_plots(data, results)
-        print(f"Visualizations created: {len(plots)} plots")
-        
-        # Save results
-        print(f"\nSaving results...")
-        result_file = Path('results') / f"swot_analysis_{datetime.now().strftime('%Y%m%d')}.json"
-        result_file.parent.mkdir(exist_ok=True)
-        analyzer.save_results(results, result_file)
-        print(f"Results saved to {result_file}")
-        
-        print(f"\n=== Analysis Complete ===")
-        print(f"Finished at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
+        # A long-running monitor logs a failed run and tries again next time
+        while True:
+            try:
+                run_once(fetcher, analyzer, visualizer)
+            except Exception as e:
+                print(f"\nRun failed: {str(e)}")
+                traceback.print_exc()
+                print(f"Retrying in {args.interval:g} s")
+            time.sleep(args.interval)
+    
     except Exception as e:
+        # One-shot runs (and setup) fail the process, so scheduled jobs see it
         print(f"\nError occurred: {str(e)}")
-        import traceback
         traceback.print_exc()
         sys.exit(1)
 
@@ -4,10 +4,13 @@ Fetches NASA SWOT satellite data from Earthdata
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import datetime
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import os
 from dotenv import load_dotenv
 
@@ -17,6 +20,28 @@ class SWOTDataFetcher:
     
     # NASA Earthdata endpoints
     EARTHDATA_URL = "https://cmr.earthdata.nasa.gov/search/granules.json"
+    PAGE_SIZE = 50
+    
+    # Number of CMR pages requested in parallel
+    MAX_CONCURRENT_REQUESTS = 4
+    
+    # Granule metadata fields kept from CMR search results
+    GRANULE_COLUMNS = ['id', 'producer_granule_id', 'time_start', 'time_end', 'boxes']
+    
+    # Observation quality levels, stored as categorical codes in this order
+    QUALITY_FLAGS = ['good', 'medium', 'poor']
+    
+    # Realistic inland water body locations (avoiding oceans) for simulated data
+    # Major lake/river regions, one row of
+    # (lon_min, lon_max, lat_min, lat_max, elev_min, elev_max) each
+    SAMPLE_REGION_BOUNDS = np.array([
+        [-92, -76, 41, 49, 174, 184],     # Great Lakes
+        [-95, -88, 32, 42, 50, 300],      # Mississippi Basin
+        [-115, -108, 32, 40, 200, 1200],  # Colorado River
+        [-122, -118, 35, 40, 50, 400],    # California Central
+        [-100, -95, 29, 34, 100, 500],    # Texas Lakes
+        [-81, -80, 25, 28, 0, 10],        # Florida Everglades
+    ], dtype=np.float64)
     
     def __init__(self, config):
         """Initialize data fetcher with configuration"""
@@ -31,6 +56,22 @@ class SWOTDataFetcher:
         
         # Region of interest
         self.bbox = config.get('bounding_box', [-180, -90, 180, 90])
+        
+        # Upper bound on CMR result pages fetched per run
+        self.max_pages = config.get('max_pages', 4)
+        
+        # Metadata of granules found by the most recent CMR search
+        self.granules = None
+        
+        # One persistent session so TCP/TLS connections are reused across pages
+        self.session = requests.Session()
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'User-Agent': 'SWOT-monitor/1.0'
+        })
     
     def fetch_latest_data(self):
         """
@@ -66,55 +107,63 @@ class SWOTDataFetcher:
         Generate sample SWOT-like data for demonstration
         Simulates inland water bodies (lakes, rivers, reservoirs) only
         """
-        np.random.seed(int(datetime.now().timestamp()) % 1000)
-        
-        # Define realistic inland water body locations (avoiding oceans)
-        # Major lake/river regions
-        regions = [
-            {'name': 'Great Lakes', 'lon': (-92, -76), 'lat': (41, 49), 'elev': (174, 184)},
-            {'name': 'Mississippi Basin', 'lon': (-95, -88), 'lat': (32, 42), 'elev': (50, 300)},
-            {'name': 'Colorado River', 'lon': (-115, -108), 'lat': (32, 40), 'elev': (200, 1200)},
-            {'name': 'California Central', 'lon': (-122, -118), 'lat': (35, 40), 'elev': (50, 400)},
-            {'name': 'Texas Lakes', 'lon': (-100, -95), 'lat': (29, 34), 'elev': (100, 500)},
-            {'name': 'Florida Everglades', 'lon': (-81, -80), 'lat': (25, 28), 'elev': (0, 10)},
-        ]
-        
-        all_features = []
-        features_per_region = 8
+        rng = np.random.default_rng(int(datetime.now().timestamp()) % 1000)
         
-        for region in regions:
-            lon_min, lon_max = region['lon']
-            lat_min, lat_max = region['lat']
-            elev_min, elev_max = region['elev']
-            
-            lons = np.random.uniform(lon_min, lon_max, features_per_region)
-            lats = np.random.uniform(lat_min, lat_max, features_per_region)
-            elevs = np.random.uniform(elev_min, elev_max, features_per_region)
-            
-            for i in range(features_per_region):
-                all_features.append({
-                    'feature_id': f'WB_{len(all_features):04d}',
-                    'longitude': lons[i],
-                    'latitude': lats[i],
-                    'water_elevation_m': elevs[i],
-                    'elevation_uncertainty_m': np.random.uniform(0.1, 2.0),
-                    'water_area_km2': np.random.uniform(0.5, 100),
-                    'observation_time': datetime.now() - timedelta(hours=np.random.randint(0, 24)),
-                    'quality_flag': np.random.choice(['good', 'medium', 'poor'], p=[0.7, 0.2, 0.1])
-                })
-        
-        df = pd.DataFrame(all_features)
+        features_per_region = 8
+        n_features = len(self.SAMPLE_REGION_BOUNDS) * features_per_region
+        
+        # Expand region bounds to one row per feature so each column can be
+        # sampled in a single vectorized call
+        bounds = np.repeat(self.SAMPLE_REGION_BOUNDS, features_per_region, axis=0)
+        lon_lo, lon_hi, lat_lo, lat_hi, elev_lo, elev_hi = bounds.T
+        
+        # Zero-padded WB_0000-style ids built in C, stored in one Arrow buffer
+        feature_ids = pd.array(np.char.add('WB_', np.char.zfill(np.arange(n_features).astype(str), 4)),
+                               dtype='string[pyarrow]')
+        
+        hours = rng.integers(0, 24, n_features)
+        quality_codes = rng.choice(np.array([0, 1, 2], dtype=np.int8), size=n_features, p=[0.7, 0.2, 0.1])
+        
+        df = pd.DataFrame({
+            'feature_id': feature_ids,
+            'longitude': rng.uniform(lon_lo, lon_hi),
+            'latitude': rng.uniform(lat_lo, lat_hi),
+            'water_elevation_m': rng.uniform(elev_lo, elev_hi),
+            'elevation_uncertainty_m': rng.uniform(0.1, 2.0, n_features),
+            'water_area_km2': rng.uniform(0.5, 100, n_features),
+            'observation_time': pd.Timestamp.now().floor('s') - pd.to_timedelta(hours, unit='h'),
+            'quality_flag': pd.Categorical.from_codes(quality_codes, categories=self.QUALITY_FLAGS)
+        })
         
         print(f"  Generated {len(df)} inland water body observations")
         return df
     
     def _save_data(self, df):
-        """Save data to local storage"""
+        """Save data to local storage as columnar Parquet"""
         timestamp = datetime.now().strftime('%Y%m%d')
-        filename = self.data_dir / f"swot_data_{timestamp}.csv"
-        df.to_csv(filename, index=False)
+        filename = self.data_dir / f"swot_data_{timestamp}.parquet"
+        
+        # Store observation times as a typed datetime column, not objects
+        df = df.assign(observation_time=pd.to_datetime(df['observation_time']))
+        df.to_parquet(filename, engine='pyarrow', compression='zstd', index=False)
         print(f"  Data saved to {filename}")
     
+    def _load_data(self, timestamp=None):
+        """
+        Load previously saved SWOT data
+        
+        Args:
+            timestamp: date string (YYYYMMDD), defaults to today
+        
+        Returns:
+            pandas.DataFrame: SWOT observations, or None if not saved
+        """
+        timestamp = timestamp or datetime.now().strftime('%Y%m%d')
+        filename = self.data_dir / f"swot_data_{timestamp}.parquet"
+        if not filename.exists():
+            return None
+        return pd.read_parquet(filename, engine='pyarrow')
+    
     def _fetch_real_nasa_data(self):
         """
         Fetch real SWOT data from NASA Earthdata CMR
@@ -125,16 +174,24 @@ class SWOTDataFetcher:
         params = {
             'short_name': 'SWOT_L2_HR_LakeSP_2.0',
             'bounding_box': ','.join(map(str, self.bbox)),
-            'page_size': 50,
+            'page_size': self.PAGE_SIZE,
             'sort_key': '-start_date'
         }
         
-        response = session.get(self.EARTHDATA_URL, params=params, timeout=30)
+        # First page tells us how many granules match the search
+        response = self._fetch_page(session, params, 1)
+        granules = response.json().get('feed', {}).get('entry', [])
         
-        if response.status_code != 200:
-            raise Exception(f"CMR search failed: {response.status_code}")
+        hits = int(response.headers.get('CMR-Hits', len(granules)))
+        n_pages = min(self.max_pages, -(-hits // self.PAGE_SIZE))
         
-        granules = response.json().get('feed', {}).get('entry', [])
+        # Remaining pages are independent, so fetch them concurrently
+        if n_pages > 1:
+            with ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_REQUESTS) as pool:
+                pages = pool.map(lambda page_num: self._fetch_page(session, params, page_num),
+                                 range(2, n_pages + 1))
+                for page in pages:
+                    granules.extend(page.json().get('feed', {}).get('entry', []))
         
         if not granules:
             return None
@@ -142,18 +199,47 @@ class SWOTDataFetcher:
         # Parse granule metadata into DataFrame
         # Note: Real SWOT data parsing would be more complex
         # This is a simplified version for demonstration
-        print(f"  Found {len(granules)} SWOT granules")
+        self.granules = self._parse_granules(granules)
+        print(f"  Found {len(self.granules)} SWOT granules")
         
         # For now, still return simulated data as SWOT data format is complex
         # In production, you would download and parse the actual NetCDF files
         return self._generate_sample_swot_data()
     
+    def _parse_granules(self, granules):
+        """
+        Flatten CMR granule entries into a metadata DataFrame
+        
+        Args:
+            granules: list of CMR 'entry' dicts
+        
+        Returns:
+            pandas.DataFrame: one row per granule with bounding box columns
+        """
+        df = pd.json_normalize(granules, max_level=2).reindex(columns=self.GRANULE_COLUMNS)
+        
+        # CMR boxes are "south west north east" strings; split the first box
+        # of every granule in one vectorized pass
+        boxes = df['boxes'].astype(object).str[0].astype('string')
+        bbox = boxes.str.split(' ', expand=True).reindex(columns=range(4)).astype(float)
+        df[['south', 'west', 'north', 'east']] = bbox.to_numpy()
+        
+        return df.drop(columns='boxes')
+    
+    def _fetch_page(self, session, params, page_num):
+        """Fetch a single page of CMR granule search results"""
+        response = session.get(self.EARTHDATA_URL, params={**params, 'page_num': page_num}, timeout=30)
+        
+        if response.status_code != 200:
+            raise Exception(f"CMR search failed: {response.status_code}")
+        
+        return response
+    
     def authenticate(self):
         """
         Authenticate with NASA Earthdata
-        Returns session object with credentials
+        Returns the shared session with credentials attached
         """
-        session = requests.Session()
         if self.username and self.password:
-            session.auth = (self.username, self.password)
-        return session
+            self.session.auth = (self.username, self.password)
+        return self.session